@@ -1,101 +1,686 @@
 import csv
+import functools
+import html
+import itertools
 import os
-import chardet
 import re
+import sys
+
+# Heavy modules (chardet, urllib, concurrent.futures, PIL, ...) are imported inside the
+# functions that need them, so a run with a known encoding and no thumbnails starts fast.
 
 
 def detect_file_encoding(file_path):
     """
     Detect the encoding of the given file.
     """
+    import chardet
+
     with open(file_path, 'rb') as f:
         result = chardet.detect(f.read())
         return result['encoding']
 
 
-def extract_projektname_from_csv(csv_file):
+def extract_projektname_from_csv(csv_file, encoding=None):
     """
     Extract a single project name ('Projektname') from the given CSV file.
 
     :param csv_file: Path to the CSV file
+    :param encoding: Encoding of the CSV file. If None, it is detected.
     :return: The first encountered project name
     """
     # Detect the file encoding
-    encoding = detect_file_encoding(csv_file)
+    encoding = encoding or detect_file_encoding(csv_file)
 
     with open(csv_file, 'r', encoding=encoding) as file:
-        csv_reader = csv.DictReader(file, delimiter="\t")  # Adjust delimiter if needed
-
-        for row in csv_reader:
-            projektname = row["Projektname"].strip()
+        csv_reader = csv.reader(file, delimiter="\t")  # Adjust delimiter if needed
+        header = next(csv_reader, None)
+        if not header:
+            return None
+        project_index = resolve_header_schema(header, csv_file)[1]["project"]
+
+        for fields in csv_reader:
+            projektname = fields[project_index].strip() if len(fields) > project_index else ""
             if projektname:  # Return the first non-empty project name
                 return projektname
 
     return None  # Return None if no project name is found
 
 
-def extract_candidates_from_csv(csv_file, filter_eignung=None, special_logos=None):
+# Display sizes (in px) of the images on the candidate card
+PHOTO_THUMBNAIL_SIZE = 100
+LOGO_THUMBNAIL_SIZE = 72
+
+# Maximum number of thumbnails kept in the cache folder
+THUMBNAIL_CACHE_MAX_ENTRIES = 500
+
+# File in the thumbnail cache folder mapping image URLs to their thumbnails
+THUMBNAIL_INDEX_FILE = "index.json"
+
+# Maximum number of distinct values kept in the HTML escaping memo
+HTML_ESCAPE_CACHE_SIZE = 8192
+
+# Bump when the compiled template format changes, so old cache entries are ignored
+TEMPLATE_CACHE_VERSION = 1
+
+# Parts of the email that can be replaced by external template files
+TEMPLATE_NAMES = ("header", "card", "footer")
+
+# Slots that generate_html() fills in each part of the email
+PROJECT_SLOTS = ("title", "logo_src", "number_candidates", "job_id")
+TEMPLATE_SLOTS = {
+    "header": PROJECT_SLOTS,
+    "card": (
+        "candidate_name", "job_title", "company", "industry", "email", "phone",
+        "photo_url", "profile_url", "expertise_list",
+    ),
+    "footer": PROJECT_SLOTS,
+}
+
+# Ranking of the "Projekteignung" values, best first
+EIGNUNG_RANKING = {"Hervorragend": 1, "Sehr gut": 2, "Gut": 3}
+
+# Ratings accepted when no explicit filter is given
+DEFAULT_EIGNUNG = ("Hervorragend", "Sehr gut", "Gut")
+
+# Default profile photos by gender
+DEFAULT_PHOTOS = {
+    "male": "https://www.experteer.de/images/default_photos/male.png",
+    "female": "https://www.experteer.de/images/default_photos/female.png",
+}
+
+DEFAULT_PHOTO_URLS = frozenset(DEFAULT_PHOTOS.values())
+
+# Fields of the internal candidate record that every header schema must map to a column
+SCHEMA_FIELDS = (
+    "project", "rating", "salutation", "title", "first_name", "last_name", "id",
+    "job_title", "company", "industry", "email", "phone", "profile_url",
+)
+
+# Header schemas of the locale exports. "columns" maps the internal fields to the column
+# names of the export, "ratings" maps its rating vocabulary to the "Projekteignung" values
+# used for filtering and ranking, and "salutations" maps its salutations to a gender.
+HEADER_SCHEMAS = {
+    "de": {
+        "columns": {
+            "project": "Projektname",
+            "rating": "Projekteignung",
+            "salutation": "Anrede",
+            "title": "Titel",
+            "first_name": "Vorname",
+            "last_name": "Nachname",
+            "id": "Mitglieds ID",
+            "job_title": "Aktuelle Position",
+            "company": "Firma",
+            "industry": "Branche",
+            "email": "E-Mail",
+            "phone": "Telefonnummer",
+            "profile_url": "URL Kandidatenprofil",
+        },
+        "ratings": {"Hervorragend": "Hervorragend", "Sehr gut": "Sehr gut", "Gut": "Gut"},
+        "salutations": {"Herr": "male", "Frau": "female"},
+    },
+    "it": {
+        "columns": {
+            "project": "Nome del progetto",
+            "rating": "Valutazione del progetto",
+            "salutation": "Appellativo",
+            "title": "Titolo",
+            "first_name": "Nome",
+            "last_name": "Cognome",
+            "id": "ID membro",
+            "job_title": "Posizione attuale",
+            "company": "Azienda",
+            "industry": "Settore",
+            "email": "E-mail",
+            "phone": "Numero di telefono",
+            "profile_url": "URL profilo candidato",
+        },
+        "ratings": {"Eccellente": "Hervorragend", "Molto buono": "Sehr gut", "Buono": "Gut"},
+        "salutations": {"Signor": "male", "Sig.": "male", "Signora": "female", "Sig.ra": "female"},
+    },
+}
+
+
+def register_header_schema(name, schema):
+    """
+    Register the header schema of another locale export (or replace an existing one).
+
+    :param name: Name of the schema, e.g. "fr".
+    :param schema: A dictionary with "columns" (internal field -> column name) and optionally
+                   "ratings" (rating -> "Projekteignung" value) and "salutations" (salutation -> "male"/"female").
+    """
+    columns = schema.get("columns") or {}
+    missing = [field for field in SCHEMA_FIELDS if field not in columns]
+    if missing:
+        raise ValueError(f"Header schema '{name}' has no columns for: {', '.join(missing)}")
+
+    HEADER_SCHEMAS[name] = {
+        "columns": dict(columns),
+        "ratings": dict(schema.get("ratings") or {}),
+        "salutations": dict(schema.get("salutations") or {}),
+    }
+
+
+def resolve_header_schema(header, csv_file=None):
+    """
+    Find the header schema matching the header row of a CSV file.
+
+    :param header: The header row as a list of column names.
+    :param csv_file: Path to the CSV file, used in the error message.
+    :return: Tuple of (schema, dictionary mapping the internal fields to column indices)
+    """
+    positions = {column.strip(): index for index, column in enumerate(header)}
+    for schema in HEADER_SCHEMAS.values():
+        columns = schema["columns"]
+        if all(column in positions for column in columns.values()):
+            return schema, {field: positions[column] for field, column in columns.items()}
+
+    raise ValueError(f"No header schema matches the columns of '{csv_file}'. Known: {', '.join(HEADER_SCHEMAS)}")
+
+
+def compile_eignung_filter(filter_eignung=None, project=None):
+    """
+    Compile a "Projekteignung" filter spec into the set of accepted ratings.
+
+    Supported specs:
+        - None or True: the default ratings ("Hervorragend", "Sehr gut", "Gut").
+        - False: no rating filter, all candidates are included (also unrated ones).
+        - A string: only candidates with exactly this rating, e.g. "Gut".
+        - A list, tuple or set: only candidates with one of these ratings.
+        - A dict with any of the keys
+            "min": the minimum rating, e.g. {"min": "Sehr gut"},
+            "allowed": an explicit list of ratings,
+            "projects": a dict mapping project names to their own spec.
+
+    :param filter_eignung: The filter spec.
+    :param project: The project name used to resolve per-project overrides.
+    :return: A frozenset of accepted ratings, or None if all candidates are included
+    """
+    if isinstance(filter_eignung, frozenset):
+        return filter_eignung
+
+    if filter_eignung is None or filter_eignung is True:
+        return frozenset(DEFAULT_EIGNUNG)
+
+    if filter_eignung is False:
+        return None
+
+    if isinstance(filter_eignung, str):
+        return frozenset([filter_eignung.strip()])
+
+    if isinstance(filter_eignung, (list, tuple, set)):
+        return frozenset(value.strip() for value in filter_eignung)
+
+    if isinstance(filter_eignung, dict):
+        overrides = filter_eignung.get("projects") or {}
+        if project is not None and project in overrides:
+            return compile_eignung_filter(overrides[project], project=project)
+
+        accepted = set()
+        if "min" in filter_eignung:
+            minimum = filter_eignung["min"].strip()
+            if minimum not in EIGNUNG_RANKING:
+                raise ValueError(f"Unknown minimum rating '{minimum}'.")
+            accepted.update(value for value, rank in EIGNUNG_RANKING.items()
+                            if rank <= EIGNUNG_RANKING[minimum])
+        if "allowed" in filter_eignung:
+            accepted.update(value.strip() for value in filter_eignung["allowed"])
+        if "min" not in filter_eignung and "allowed" not in filter_eignung:
+            accepted.update(DEFAULT_EIGNUNG)
+        return frozenset(accepted)
+
+    raise ValueError(f"Unsupported filter for 'Projekteignung': {filter_eignung!r}")
+
+
+def extract_candidates_from_csv(csv_file, filter_eignung=None, special_logos=None, project=None, encoding=None):
     """
     Extract candidate data from a CSV file and return a list of dictionaries.
 
     :param csv_file: Path to the CSV file
-    :param filter_eignung: Filter for "Projekteignung". If None, all candidates are included.
+    :param filter_eignung: Filter spec for "Projekteignung", see compile_eignung_filter().
                            Example: "Gut" to include only candidates with "Projekteignung" == "Gut".
+    :param special_logos: A dictionary mapping candidate IDs to special logo URLs.
+    :param project: The project name used to resolve per-project filter overrides.
+                    If None, the project name found in the file is used.
+    :param encoding: Encoding of the CSV file. If None, it is detected.
     :return: List of dictionaries containing candidate data
     """
+    return read_project_csv(
+        csv_file, filter_eignung=filter_eignung, special_logos=special_logos, project=project, encoding=encoding
+    )[1]
+
+
+def read_project_csv(csv_file, filter_eignung=None, special_logos=None, project=None, encoding=None):
+    """
+    Read the project name and the candidates of a CSV file in a single pass.
+
+    The columns are mapped with the header schema matching the header row, so exports of
+    every registered locale produce the same records (see HEADER_SCHEMAS). The
+    "Projekteignung" filter is applied to the raw rating column before a record is built,
+    so rejected rows (most of them are unrated) are skipped without further work.
+
+    :param csv_file: Path to the CSV file
+    :param filter_eignung: Filter spec for "Projekteignung", see compile_eignung_filter().
+    :param special_logos: A dictionary mapping candidate IDs to special logo URLs.
+    :param project: The project name used to resolve per-project filter overrides.
+                    If None, the project name found in the file is used.
+    :param encoding: Encoding of the CSV file. If None, it is detected.
+    :return: Tuple of (first non-empty project name or None, list of candidate dictionaries)
+    """
     special_logos = special_logos or {}
-    encoding = detect_file_encoding(csv_file)
+    encoding = encoding or detect_file_encoding(csv_file)
+    title = None
     candidates = []
     
     with open(csv_file, 'r', encoding=encoding) as file:
-        csv_reader = csv.DictReader(file, delimiter="\t")  # Adjust delimiter if needed
+        csv_reader = csv.reader(file, delimiter="\t")  # Adjust delimiter if needed
+        header = next(csv_reader, None)
+        if not header:
+            return title, candidates
+        schema, columns = resolve_header_schema(header, csv_file)
+        project_index = columns["project"]
+        eignung_index = columns["rating"]
+        width = max(columns.values()) + 1
+
+        # The project name is needed for the filter overrides. It is usually in the first row,
+        # the rows before it are kept until it is found.
+        pending = []
+        for fields in csv_reader:
+            pending.append(fields)
+            if len(fields) > project_index and fields[project_index].strip():
+                title = fields[project_index].strip()
+                break
+
+        accepted = compile_eignung_filter(filter_eignung, project=project or title)
+
+        # Accepted raw ratings of this locale, mapped to their "Projekteignung" value. Free-form
+        # values outside the rating vocabulary (e.g. "Mittel") are accepted as they are.
+        ratings = schema["ratings"]
+        accepted_raw = None
+        if accepted is not None:
+            accepted_raw = {raw: eignung for raw, eignung in ratings.items() if eignung in accepted}
+            accepted_raw.update(
+                (eignung, eignung) for eignung in accepted
+                if eignung not in EIGNUNG_RANKING and eignung not in ratings
+            )
 
-        for row in csv_reader:
-            eignung = row["Projekteignung"].strip()
-            
-            # Handle missing or false eignung cases
-            if not eignung or eignung not in ["Sehr gut", "Gut", "Hervorragend"]:
+        for fields in itertools.chain(pending, csv_reader):
+            # Reject on the raw field before building the record. Repeated column values
+            # (position, company, industry, rating) are interned, so each is stored once.
+            if len(fields) <= eignung_index:
                 continue
+            raw_eignung = fields[eignung_index].strip()
+            if accepted_raw is None:
+                # Rating words of another locale are not mapped, the candidate counts as unrated
+                eignung = ratings.get(raw_eignung, "" if raw_eignung in EIGNUNG_RANKING else raw_eignung)
+            else:
+                eignung = accepted_raw.get(raw_eignung)
+                if eignung is None:
+                    continue
+
+            if len(fields) < width:
+                fields += [""] * (width - len(fields))
 
             # Determine photo URL based on "Anrede"
-            candidate_id = row["Mitglieds ID"]
+            candidate_id = fields[columns["id"]]
             if candidate_id in special_logos and "url" in special_logos[candidate_id]:
                 photo_url = special_logos[candidate_id]["url"]
-            elif row["Anrede"] == "Herr":
-                photo_url = "https://www.experteer.de/images/default_photos/male.png"
-            elif row["Anrede"] == "Frau":
-                photo_url = "https://www.experteer.de/images/default_photos/female.png"
             else:
-                photo_url = "https://www.experteer.de/images/default_photos/female.png"
+                gender = schema["salutations"].get(fields[columns["salutation"]], "female")
+                photo_url = DEFAULT_PHOTOS.get(gender, DEFAULT_PHOTOS["female"])
 
             # Include title in the candidate's name if present
-            title = row["Titel"].strip()
-            full_name = f"{title} {row['Vorname']} {row['Nachname']}".strip() if title else f"{row['Vorname']} {row['Nachname']}".strip()
+            name_title = fields[columns["title"]].strip()
+            name = f"{fields[columns['first_name']]} {fields[columns['last_name']]}"
+            full_name = f"{name_title} {name}".strip() if name_title else name.strip()
 
             candidate = {
                 "name": full_name,
-                "id": row["Mitglieds ID"],
-                "job_title": row['Aktuelle Position'],
-                "company": row["Firma"],
-                "industry": row["Branche"],
-                "email": row["E-Mail"],
-                "phone": row["Telefonnummer"],
+                "id": candidate_id,
+                "job_title": sys.intern(fields[columns["job_title"]]),
+                "company": sys.intern(fields[columns["company"]]),
+                "industry": sys.intern(fields[columns["industry"]]),
+                "email": fields[columns["email"]],
+                "phone": fields[columns["phone"]],
                 "photo_url": photo_url,
-                "profile_url": row["URL Kandidatenprofil"],
-                "eignung": eignung  # Can be None
+                "profile_url": fields[columns["profile_url"]],
+                "eignung": sys.intern(eignung)
             }
             candidates.append(candidate)
     
-    eignung_ranking = {"Hervorragend": 1, "Sehr gut": 2, "Gut": 3}
-    candidates.sort(key=lambda c: eignung_ranking.get(c["eignung"], float('inf')))
+    candidates.sort(key=lambda c: EIGNUNG_RANKING.get(c["eignung"], float('inf')))
 
+    return title, candidates
 
-    
-    return candidates
 
 
+def normalize_image_url(url):
+    """
+    Turn an image URL as used in the templates into a fetchable URL or local path.
+
+    :param url: Image URL, protocol-relative URL ("//host/path"), host-relative URL or local file path
+    :return: The fetchable URL or local path
+    """
+    if os.path.isfile(url) or "://" in url:
+        return url
+    if url.startswith("//"):
+        return "https:" + url
+    return "https://" + url
+
+
+def fetch_image(url, timeout=10):
+    """
+    Fetch the raw bytes of an image from a local file or any URL supported by urllib
+    (http, https, file).
+
+    :param url: Image URL or local file path
+    :param timeout: Timeout in seconds for remote URLs
+    :return: The image bytes
+    """
+    from urllib.request import urlopen
+
+    url = normalize_image_url(url)
+    if os.path.isfile(url):
+        with open(url, 'rb') as f:
+            return f.read()
+
+    with urlopen(url, timeout=timeout) as response:
+        return response.read()
+
+
+def _make_thumbnail(job):
+    """
+    Fetch one image and store its thumbnail in the cache folder (runs in a worker process).
+
+    Thumbnails are addressed by the hash of the source image and the size, so the same
+    image behind different URLs is only resized and stored once.
+
+    :param job: Tuple of (url, size, cache_dir)
+    :return: Tuple of (url, size, thumbnail file name or None, error message or None)
+    """
+    import hashlib
+    import io
+
+    url, size, cache_dir = job
+    try:
+        data = fetch_image(url)
+        file_name = f"{hashlib.sha256(data).hexdigest()}_{size}.png"
+        file_path = os.path.join(cache_dir, file_name)
+
+        if os.path.exists(file_path):
+            os.utime(file_path)  # Mark as recently used for the eviction
+            return url, size, file_name, None
+
+        from PIL import Image
+
+        with Image.open(io.BytesIO(data)) as image:
+            image.thumbnail((size, size))  # Keeps the aspect ratio
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA")
+            tmp_path = f"{file_path}.{os.getpid()}.tmp"
+            image.save(tmp_path, "PNG", optimize=True)
+        os.replace(tmp_path, file_path)
+        return url, size, file_name, None
+    except Exception as e:
+        return url, size, None, str(e)
+
+
+def _thumbnail_key(url, size):
+    """
+    Return the key of an image in the thumbnail index.
+
+    Local files include their size and modification time, so a changed file is resized again.
+    Remote images are keyed by URL; run "clean --thumbnails" to pick up changed remote images.
+    """
+    path = normalize_image_url(url)
+    if os.path.isfile(path):
+        stat = os.stat(path)
+        return f"{size}|{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return f"{size}|{url}"
+
+
+def evict_thumbnails(cache_dir, max_entries=THUMBNAIL_CACHE_MAX_ENTRIES, keep=()):
+    """
+    Remove the least recently used thumbnails until at most max_entries are left.
+
+    :param cache_dir: Path to the thumbnail cache folder.
+    :param max_entries: Maximum number of thumbnails to keep.
+    :param keep: File names that must not be removed (e.g. used by the current run).
+    """
+    entries = [
+        os.path.join(cache_dir, file_name)
+        for file_name in os.listdir(cache_dir)
+        if file_name.endswith(".png") and file_name not in keep
+    ]
+    excess = len(entries) + len(keep) - max_entries
+    if excess <= 0:
+        return
+
+    entries.sort(key=os.path.getmtime)
+    for file_path in entries[:excess]:
+        try:
+            os.remove(file_path)
+        except OSError as e:
+            print(f"Error removing thumbnail {file_path}: {e}")
+
+
+def build_thumbnails(images, cache_dir, embed=False, base_url=None,
+                     max_entries=THUMBNAIL_CACHE_MAX_ENTRIES, processes=None):
+    """
+    Fetch each unique image once and resize it to its display size in a process pool.
+
+    An index in the cache folder maps each image URL to its thumbnail, so images that are
+    already cached are not downloaded again. After the build, the cache is evicted once,
+    keeping every thumbnail used by this build.
+
+    :param images: Pairs of (image URL, maximum width and height in px). Duplicates are fetched only once.
+    :param cache_dir: Path to the thumbnail cache folder.
+    :param embed: If True, the thumbnails are embedded as data URIs.
+    :param base_url: Public URL of the cache folder. If None and embed is False, the absolute
+                     path of the cached file is returned, and generate_html() links it relative
+                     to the HTML file. That only works for local previews, so sent emails need
+                     embed or base_url.
+    :param max_entries: Maximum number of thumbnails kept in the cache folder.
+    :param processes: Number of worker processes. If None, one per CPU.
+    :return: A dictionary mapping each (URL, size) pair to the src of its thumbnail.
+             Images that could not be fetched or resized are left out.
+    """
+    unique_images = sorted({(url, size) for url, size in images if url})
+    if not unique_images:
+        return {}
+
+    import base64
+    import json
+
+    os.makedirs(cache_dir, exist_ok=True)
+    index_file = os.path.join(cache_dir, THUMBNAIL_INDEX_FILE)
+    try:
+        with open(index_file, 'r', encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    # Reuse indexed thumbnails, fetch the others
+    file_names = {}
+    jobs = []
+    for url, size in unique_images:
+        file_name = index.get(_thumbnail_key(url, size))
+        if file_name and os.path.exists(os.path.join(cache_dir, file_name)):
+            os.utime(os.path.join(cache_dir, file_name))  # Mark as recently used for the eviction
+            file_names[(url, size)] = file_name
+        else:
+            jobs.append((url, size, cache_dir))
+
+    if jobs:
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            print("Warning: Pillow is not installed, using the original images.")
+            jobs = []
+
+    if jobs:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            for url, size, file_name, error in executor.map(_make_thumbnail, jobs):
+                if file_name is None:
+                    print(f"Warning: No thumbnail for '{url}': {error}")
+                    continue
+                file_names[(url, size)] = file_name
+                index[_thumbnail_key(url, size)] = file_name
+
+    evict_thumbnails(cache_dir, max_entries=max_entries, keep=set(file_names.values()))
+
+    # Drop index entries of evicted thumbnails
+    index = {key: file_name for key, file_name in index.items()
+             if os.path.exists(os.path.join(cache_dir, file_name))}
+    tmp_file = f"{index_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_file, index_file)
+
+    thumbnails = {}
+    for image, file_name in file_names.items():
+        file_path = os.path.join(cache_dir, file_name)
+        if embed:
+            with open(file_path, 'rb') as f:
+                thumbnails[image] = "data:image/png;base64," + base64.b64encode(f.read()).decode("ascii")
+        elif base_url:
+            thumbnails[image] = f"{base_url.rstrip('/')}/{file_name}"
+        else:
+            thumbnails[image] = os.path.abspath(file_path)
+    return thumbnails
+
+
+@functools.lru_cache(maxsize=HTML_ESCAPE_CACHE_SIZE)
+def escape_html(value):
+    """
+    HTML-escape a value for the templates, including quotes so it is safe in attributes.
+
+    Only for values that repeat across candidates and projects (company, industry, position,
+    default photo and logo srcs, expertises), whose results are memoized. Unique values
+    are escaped with html.escape() directly, so they do not push those out of the memo.
+
+    :param value: The value to escape.
+    :return: The escaped string
+    """
+    return html.escape(str(value), quote=True)
+
+
+@functools.lru_cache(maxsize=None)
+def compile_template(text):
+    """
+    Compile a template into its static chunks and slots.
+
+    Templates use the str.format() syntax of the built-in templates: "{name}" is a slot and
+    "{{" / "}}" are literal braces. Only plain names are supported as slots.
+
+    :param text: The template text.
+    :return: Tuple of (chunks, slots), with one more chunk than slots
+    """
+    import string
+
+    chunks = []
+    slots = []
+    literal = ""
+    for text_part, field_name, format_spec, conversion in string.Formatter().parse(text):
+        literal += text_part
+        if field_name is None:
+            continue
+        if not field_name.isidentifier() or format_spec or conversion:
+            raise ValueError(f"Unsupported template slot '{{{field_name}}}'. Only plain names are allowed.")
+        chunks.append(literal)
+        slots.append(field_name)
+        literal = ""
+    chunks.append(literal)
+    return tuple(chunks), tuple(slots)
+
+
+def render_template(compiled, values):
+    """
+    Fill the slots of a compiled template.
+
+    :param compiled: Tuple of (chunks, slots), see compile_template().
+    :param values: A dictionary mapping slot names to their values.
+    :return: The rendered text
+    """
+    chunks, slots = compiled
+    parts = [chunks[0]]
+    for slot, chunk in zip(slots, chunks[1:]):
+        parts.append(str(values[slot]))
+        parts.append(chunk)
+    return "".join(parts)
+
+
+def load_template(template_file, cache_dir=None):
+    """
+    Load a template file in its compiled form.
+
+    The compiled template is stored in cache_dir under the hash of the file content, so
+    repeated runs and worker processes reuse it, and any change to the file invalidates it.
 
-def generate_html(title, logo_url, job_id, expertise_dict, number_candidates, candidates, output_file):
+    :param template_file: Path to the template file (UTF-8).
+    :param cache_dir: Path to the compiled template cache folder. If None, nothing is cached on disk.
+    :return: Tuple of (chunks, slots), see compile_template()
+    """
+    import hashlib
+    import json
+
+    with open(template_file, 'rb') as f:
+        data = f.read()
+
+    if not cache_dir:
+        return compile_template(data.decode("utf-8"))
+
+    digest = hashlib.sha256(data).hexdigest()
+    cache_file = os.path.join(cache_dir, f"{digest}.v{TEMPLATE_CACHE_VERSION}.json")
+    try:
+        with open(cache_file, 'r', encoding="utf-8") as f:
+            cached = json.load(f)
+        return tuple(cached["chunks"]), tuple(cached["slots"])
+    except (OSError, ValueError, KeyError):
+        pass
+
+    chunks, slots = compile_template(data.decode("utf-8"))
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding="utf-8") as f:
+        json.dump({"chunks": chunks, "slots": slots}, f, ensure_ascii=False)
+    os.replace(tmp_file, cache_file)
+    return chunks, slots
+
+
+def load_templates(template_files, cache_dir=None):
+    """
+    Load the external templates for the parts of the email.
+
+    :param template_files: A dictionary mapping "header", "card" and/or "footer" to template files.
+                           Parts that are not given keep the built-in template.
+    :param cache_dir: Path to the compiled template cache folder, see load_template().
+    :return: A dictionary mapping the part names to compiled templates
+    """
+    template_files = template_files or {}
+    unknown = set(template_files) - set(TEMPLATE_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown templates: {', '.join(sorted(unknown))}. Available: {', '.join(TEMPLATE_NAMES)}")
+
+    templates = {}
+    for name, path in template_files.items():
+        templates[name] = load_template(path, cache_dir=cache_dir)
+
+        # Check the slots now, so a typo does not leave a half-written file at render time
+        unknown_slots = sorted(set(templates[name][1]) - set(TEMPLATE_SLOTS[name]))
+        if unknown_slots:
+            raise ValueError(
+                f"Unknown slots in the {name} template '{path}': {', '.join(unknown_slots)}. "
+                f"Available: {', '.join(TEMPLATE_SLOTS[name])}"
+            )
+    return templates
+
+
+def generate_html(title, logo_url, job_id, expertise_dict, number_candidates, candidates, output_file,
+                  thumbnails=None, templates=None):
     """
     Generate an HTML file for the provided candidate data.
 
@@ -104,7 +689,27 @@ def generate_html(title, logo_url, job_id, expertise_dict, number_candidates, ca
     :param number_candidates: Number of candidates included in the HTML.
     :param candidates: List of dictionaries containing candidate data.
     :param output_file: The file path where the HTML will be saved.
+    :param thumbnails: A dictionary mapping (original image URL, size) pairs to thumbnail srcs (see build_thumbnails()).
+    :param templates: Compiled "header", "card" and "footer" templates replacing the built-in ones
+                      (see load_templates()). All slot values are HTML-escaped, except "expertise_list"
+                      which is the already escaped HTML of the expertise tags.
     """
+    thumbnails = thumbnails or {}
+    templates = templates or {}
+
+    def image_src(url, size):
+        # Local thumbnails (see build_thumbnails()) are linked relative to the HTML file
+        src = thumbnails.get((url, size))
+        if src and os.path.isabs(src) and os.path.isfile(src):
+            return os.path.relpath(src, os.path.dirname(os.path.abspath(output_file)))
+        return src
+
+    def escape_src(src, repeated):
+        # Data URIs are base64 and need no escaping; only repeated srcs go through the memo
+        if src.startswith("data:"):
+            return src
+        return escape_html(src) if repeated else html.escape(src, quote=True)
+
     # Base HTML template
     html_template = """
 <!doctype html>
@@ -483,7 +1088,7 @@ def generate_html(title, logo_url, job_id, expertise_dict, number_candidates, ca
                 <tr>
                     <!-- Logo Section -->
                     <td align="center" width="20%" style="padding:10px;">
-                        <img src="https://{logo_url}"
+                        <img src="{logo_src}"
                             alt="Logo" style="display:block; width:72px; height:auto; border:0;" width="72">
                     </td>
 
@@ -536,7 +1141,7 @@ def generate_html(title, logo_url, job_id, expertise_dict, number_candidates, ca
                             <tr>
                                 <!-- Profile Image -->
                                 <td style="width: 25%; text-align: center; padding-right: 15px;">
-                                    <img src={photo_url}
+                                    <img src="{photo_url}"
                                         alt="Profile Image" style="border-radius: 50%; width: 100%; height: auto;" />
                                 </td>
                                 <!-- User Details and View Profile -->
@@ -569,7 +1174,7 @@ def generate_html(title, logo_url, job_id, expertise_dict, number_candidates, ca
                 <!-- View Profile Link -->
                 <tr>
                     <td style="text-align: right; font-family: Lato; font-size: 14px; padding:0px 5px 10px 0px">
-                        <a href={profile_url}
+                        <a href="{profile_url}"
                             style="text-decoration: none;">Profil
                             ansehen</a>
                     </td>
@@ -653,46 +1258,182 @@ def generate_html(title, logo_url, job_id, expertise_dict, number_candidates, ca
     def generate_expertise_rows(expertise_list):
         return "".join(f"""
             <div style="font-family: Lato; font-size: 14px; color: #525b65; border: 1px solid #525b65; border-radius: 50px; display: inline-block; padding: 2px 6px;">
-                {expertise}
+                {escape_html(expertise)}
             </div>
         """ for expertise in expertise_list)
 
-    # Create the candidates' section content
-    candidates_section = ""
-    for candidate in candidates:
-        candidate_id = candidate["id"]
-        expertise_list_html = ""
-
-        # Retrieve expertise for the candidate
-        if candidate_id in expertise_dict:
-            expertise_list_html = generate_expertise_rows(expertise_dict[candidate_id]["expertises"])
-        #else:
-        #    expertise_list_html = generate_expertise_rows(["No expertise listed"])
-
-        candidates_section += candidate_template.format(
-            candidate_name=candidate["name"],
-            job_title=candidate["job_title"],
-            company=candidate["company"],
-            industry=candidate["industry"],
-            email=candidate["email"],
-            phone=candidate["phone"],
-            photo_url=candidate["photo_url"],
-            profile_url=candidate["profile_url"],
-            expertise_list=expertise_list_html,
+    header = templates.get("header") or compile_template(html_template)
+    card = templates.get("card") or compile_template(candidate_template)
+    footer = templates.get("footer") or compile_template(end)
+
+    logo_src = image_src(logo_url, LOGO_THUMBNAIL_SIZE) or f"https://{logo_url}"
+    project_values = dict(
+        title=html.escape(str(title), quote=True),
+        logo_src=escape_src(logo_src, repeated=True),
+        number_candidates=html.escape(str(number_candidates), quote=True),
+        job_id=html.escape(str(job_id), quote=True),
+    )
+
+    # Write the HTML to the file section by section
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write(render_template(header, project_values))
+
+        for candidate in candidates:
+            candidate_id = candidate["id"]
+            expertise_list_html = ""
+
+            # Retrieve expertise for the candidate
+            if candidate_id in expertise_dict:
+                expertise_list_html = generate_expertise_rows(expertise_dict[candidate_id]["expertises"])
+            #else:
+            #    expertise_list_html = generate_expertise_rows(["No expertise listed"])
+
+            file.write(render_template(card, dict(
+                candidate_name=html.escape(candidate["name"], quote=True),
+                job_title=escape_html(candidate["job_title"]),
+                company=escape_html(candidate["company"]),
+                industry=escape_html(candidate["industry"]),
+                email=html.escape(candidate["email"], quote=True),
+                phone=html.escape(candidate["phone"], quote=True),
+                photo_url=escape_src(image_src(candidate["photo_url"], PHOTO_THUMBNAIL_SIZE) or candidate["photo_url"],
+                                     repeated=candidate["photo_url"] in DEFAULT_PHOTO_URLS),
+                profile_url=html.escape(candidate["profile_url"], quote=True),
+                expertise_list=expertise_list_html,
+            )))
+
+        file.write(render_template(footer, project_values))
+    print(f"HTML file '{output_file}' has been generated successfully.")
+
+
+def generate_text(title, job_id, expertise_dict, candidates, output_file):
+    """
+    Generate the plain-text alternative of the email for the provided candidate data.
+
+    :param title: The project name.
+    :param job_id: The ID of the job posting on Experteer.
+    :param expertise_dict: A dictionary mapping candidate IDs to their expertises.
+    :param candidates: List of dictionaries containing candidate data.
+    :param output_file: The file path where the text will be saved.
+    """
+    with open(output_file, "w", encoding="utf-8") as file:
+        file.write(
+            "Premium Recruitment Assistant\n\n"
+            "Sehr geehrte/r Herr/Frau xx,\n\n"
+            f"Ihre Stellenanzeige „{title}“ ist live auf Experteer.de – dem Karriereservice für Executives "
+            "und Senior Professionals:\n"
+            f"https://www.experteer.de/career/positions/{job_id}\n\n"
+            "Dazu liefert Ihnen unser Experteer Premium Recruitment Assistant heute als Inklusivleistung "
+            "zu Ihrer Stellenanzeige und ohne weitere verdeckte Kosten:\n\n"
+            f"{len(candidates)} ausgewählte Top-Kandidaten-Profile\n"
+            "- passend zu Ihrem Anforderungsprofil\n"
+            "- interessiert an Ihrer Position\n"
+            "- gesprächsbereit auf Ihre Ansprache\n\n"
+            "Die Kandidaten warten auf Ihre Rückmeldung! Nehmen Sie jetzt Kontakt auf! – "
+            "direkt und kostenfrei mit den hier bereits angegebenen Kontaktdaten.\n\n"
         )
 
-    # Combine the template with the filled candidate sections
+        for rank, candidate in enumerate(candidates, start=1):
+            lines = [
+                f"{rank}. {candidate['name']}",
+                f"   {candidate['job_title']}",
+                f"   {candidate['company']} - {candidate['industry']}",
+            ]
+            if candidate["id"] in expertise_dict:
+                lines.append(f"   Expertise: {', '.join(expertise_dict[candidate['id']]['expertises'])}")
+            lines += [
+                f"   E-Mail: {candidate['email']}",
+                f"   Telefon: {candidate['phone']}",
+                f"   Profil ansehen: {candidate['profile_url']}",
+            ]
+            file.write("\n".join(lines) + "\n\n")
+
+        file.write(
+            "Für weitere Informationen zu unserem Service besuchen Sie "
+            "https://www.experteer.de/recruiting/page/products_premium_recruitment_assistant\n\n"
+            "Sie erreichen Ihren Experteer Business Partner Manager unter email@experteer.com.\n"
+        )
+    print(f"Text file '{output_file}' has been generated successfully.")
 
-    candidates_complete = candidates_section.format(candidates_section=candidates_section)
-    html_content = html_template.format(title=title,logo_url=logo_url,number_candidates=number_candidates, job_id=job_id)
-    
 
-    html_final = html_content + candidates_complete + end
+def generate_json_digest(title, job_id, candidates, output_file):
+    """
+    Generate a JSON summary of the project with candidate IDs, ranks and counts.
+
+    :param title: The project name.
+    :param job_id: The ID of the job posting on Experteer.
+    :param candidates: List of dictionaries containing candidate data, sorted by rank.
+    :param output_file: The file path where the JSON will be saved.
+    """
+    import json
+
+    counts = {}
+    for candidate in candidates:
+        counts[candidate["eignung"]] = counts.get(candidate["eignung"], 0) + 1
 
-    # Save the HTML to a file
+    # Write the candidates one by one instead of building the whole document
     with open(output_file, "w", encoding="utf-8") as file:
-        file.write(html_final)
-    print(f"HTML file '{output_file}' has been generated successfully.")
+        file.write("{\n")
+        file.write(f'  "project": {json.dumps(title, ensure_ascii=False)},\n')
+        file.write(f'  "job_id": {json.dumps(job_id)},\n')
+        file.write(f'  "count": {len(candidates)},\n')
+        file.write(f'  "counts": {json.dumps(counts, ensure_ascii=False)},\n')
+        file.write('  "candidates": [')
+        for rank, candidate in enumerate(candidates, start=1):
+            entry = {"rank": rank, "id": candidate["id"], "eignung": candidate["eignung"]}
+            file.write(("\n    " if rank == 1 else ",\n    ") + json.dumps(entry, ensure_ascii=False))
+        file.write("\n  ]\n}\n" if candidates else "]\n}\n")
+    print(f"JSON file '{output_file}' has been generated successfully.")
+
+
+def html_sink(project, output_base):
+    """
+    Output sink writing the HTML email of a project to '<output_base>.html'.
+    """
+    generate_html(
+        title=project["title"],
+        logo_url=project["logo_url"],
+        expertise_dict=project["expertise_dict"],
+        number_candidates=len(project["candidates"]),
+        candidates=project["candidates"],
+        output_file=output_base + ".html",
+        job_id=project["job_id"],
+        thumbnails=project["thumbnails"],
+        templates=project["templates"],
+    )
+
+
+def text_sink(project, output_base):
+    """
+    Output sink writing the plain-text alternative of a project to '<output_base>.txt'.
+    """
+    generate_text(
+        title=project["title"],
+        job_id=project["job_id"],
+        expertise_dict=project["expertise_dict"],
+        candidates=project["candidates"],
+        output_file=output_base + ".txt",
+    )
+
+
+def json_sink(project, output_base):
+    """
+    Output sink writing the JSON digest of a project to '<output_base>.json'.
+    """
+    generate_json_digest(
+        title=project["title"],
+        job_id=project["job_id"],
+        candidates=project["candidates"],
+        output_file=output_base + ".json",
+    )
+
+
+# Registered output sinks. A sink is called with the parsed project and the output path
+# without extension, so all outputs are rendered from the same parsed candidates.
+OUTPUT_SINKS = {
+    "html": html_sink,
+    "text": text_sink,
+    "json": json_sink,
+}
 
 
 def clear_folder(folder_path):
@@ -724,85 +1465,374 @@ def clear_folder(folder_path):
     print(f"All files in the folder '{folder_path}' have been removed.")
 
 
-def generate_german_emails(folder_path, output_folder, filter_eignung, special_logos, project_logos):
+def list_csv_files(folder_path):
+    """
+    List the CSV files in one or more folders.
+
+    :param folder_path: Path to a folder, or a list of paths (e.g. one per locale export).
+    :return: List of CSV file paths
+    """
+    folders = [folder_path] if isinstance(folder_path, str) else folder_path
+    return [
+        os.path.join(folder, file_name)
+        for folder in folders
+        for file_name in os.listdir(folder)
+        if file_name.endswith(".csv")
+    ]
+
+
+def generate_german_emails(folder_path, output_folder, filter_eignung, special_logos, project_logos,
+                           thumbnail_dir=None, embed_thumbnails=False, thumbnail_base_url=None, encoding=None,
+                           outputs=("html",), templates=None, template_cache=None):
     """
     Process all CSV files in a folder, extract candidate data, and generate an HTML file for each.
 
-    :param folder_path: Path to the folder containing CSV files.
-    :param filter_eignung: Filter for "Valutazione del progetto". If None, all candidates are included.
+    Exports of all locales in HEADER_SCHEMAS can be mixed in one batch: the columns of each
+    file are resolved from its header row, and the thumbnails and caches are shared.
+
+    :param folder_path: Path to the folder containing CSV files, or a list of such folders.
+    :param filter_eignung: Filter spec for "Projekteignung", see compile_eignung_filter().
+                           Per-project overrides are resolved with the project name.
     :param special_logos: A dictionary mapping candidate IDs to special logo URLs.
     :param project_logos: A dictionary mapping project names to their company logo URLs.
+    :param thumbnail_dir: Path to the thumbnail cache folder. If None, the original images are used.
+    :param embed_thumbnails: If True, the thumbnails are embedded in the HTML as data URIs.
+    :param thumbnail_base_url: Public URL under which the thumbnail cache folder is served.
+                               Without it (and without embed_thumbnails) the thumbnails are linked
+                               as local files relative to the output folder, for previews only.
+    :param encoding: Encoding of the CSV files. If None, it is detected for each file.
+    :param outputs: Output sinks, given as names from OUTPUT_SINKS or as callables taking
+                    (project, output_base). Each CSV file is parsed once for all of them.
+    :param templates: A dictionary mapping "header", "card" and/or "footer" to template files.
+    :param template_cache: Path to the compiled template cache folder.
     """
     special_logos = special_logos or {}
     project_logos = project_logos or {}
+    sinks = []
+    for output in outputs:
+        if callable(output):
+            sinks.append(output)
+        elif output in OUTPUT_SINKS:
+            sinks.append(OUTPUT_SINKS[output])
+        else:
+            raise ValueError(f"Unknown output '{output}'. Available: {', '.join(OUTPUT_SINKS)}")
+    compiled_templates = load_templates(templates, cache_dir=template_cache)
+    compile_eignung_filter(filter_eignung)  # Fail on an invalid filter before skipping files below
+
+    # Parse all projects first so every unique image is fetched only once per batch
+    projects = []
+    for csv_file in list_csv_files(folder_path):
+        try:
+            title, candidates = read_project_csv(
+                csv_file, filter_eignung=filter_eignung, special_logos=special_logos, encoding=encoding
+            )
+        except ValueError as e:
+            # E.g. a CSV file whose header matches no schema; the other files are still generated
+            print(f"Skipping file {csv_file}: {e}")
+            continue
+
+        if not title:
+            print(f"Skipping file {csv_file}: No project name found.")
+            continue
+
+        # Check if the title exists in project_logos
+        if title in project_logos.keys():
+            job_id, company_logo_url = project_logos[title][0], project_logos[title][1]
+        else:
+            print(f"Warning: No logo found for project '{title}'.")
+            job_id = ""
+            company_logo_url = "" # Replace with your actual default URL https://default-logo-url.com/default-logo.png
+
+        projects.append({
+            "title": title,
+            "job_id": job_id,
+            "logo_url": company_logo_url,
+            "candidates": candidates,
+            "expertise_dict": special_logos,
+            "source": csv_file,
+        })
+
+    thumbnails = {}
+    if thumbnail_dir:
+        if not embed_thumbnails and not thumbnail_base_url:
+            print("Warning: Thumbnails are linked as local files. Set embed_thumbnails or "
+                  "thumbnail_base_url for emails that are sent.")
+        images = [(candidate["photo_url"], PHOTO_THUMBNAIL_SIZE)
+                  for project in projects for candidate in project["candidates"]]
+        images += [(project["logo_url"], LOGO_THUMBNAIL_SIZE) for project in projects]
+        thumbnails = build_thumbnails(images, thumbnail_dir, embed=embed_thumbnails, base_url=thumbnail_base_url)
+
+    output_bases = {}
+    for project in projects:
+        if not os.path.exists(output_folder):
+            os.mkdir(output_folder)
+
+        project["thumbnails"] = thumbnails
+        project["templates"] = compiled_templates
+        sanitized_title = re.sub(r'[<>:"/\\|?*]', '_', project["title"])
+        output_base = os.path.join(output_folder, sanitized_title)
+
+        # Projects with the same title (e.g. in exports of several locales) must not overwrite each other
+        if output_base in output_bases:
+            folder_name = os.path.basename(os.path.dirname(os.path.abspath(project["source"])))
+            source_name = os.path.splitext(os.path.basename(project["source"]))[0]
+            suffix = re.sub(r'[<>:"/\\|?*]', '_', f"{folder_name} {source_name}")
+            new_name = f"{sanitized_title} ({suffix})"
+            counter = 2
+            while os.path.join(output_folder, new_name) in output_bases:
+                new_name = f"{sanitized_title} ({suffix} {counter})"
+                counter += 1
+            print(f"Warning: Project '{project['title']}' from {project['source']} has the same output name as "
+                  f"{output_bases[output_base]}. Writing it as '{new_name}'.")
+            output_base = os.path.join(output_folder, new_name)
+        output_bases[output_base] = project["source"]
+
+        for sink in sinks:
+            sink(project, output_base)
+        print(f"Files generated for project '{project['title']}' at {output_base}")
+
+
+# Default configuration, overridden by the config file and the command line options
+DEFAULT_CONFIG = {
+    "input_folder": "german_projects",
+    "output_folder": "german_projects_finished",
+    "filter_eignung": True,
+    "encoding": None,
+    "special_logos": {},
+    "project_logos": {},
+    "thumbnail_dir": None,
+    "embed_thumbnails": False,
+    "thumbnail_base_url": None,
+    "outputs": ["html"],
+    "templates": {},
+    "template_cache": ".template_cache",
+    "header_schemas": {},
+}
 
-    for file_name in os.listdir(folder_path):
-        if file_name.endswith(".csv"):
-            csv_file = os.path.join(folder_path, file_name)
-            title = extract_projektname_from_csv(csv_file)
 
-            if not title:
-                print(f"Skipping file {csv_file}: No project name found.")
-                continue
+def load_config(config_file=None):
+    """
+    Load the configuration from a JSON or TOML file and merge it into the defaults.
 
-            candidates = extract_candidates_from_csv(
-                csv_file, filter_eignung=filter_eignung, special_logos=special_logos
-            )
+    :param config_file: Path to a .json or .toml file. If None, the defaults are returned.
+    :return: The configuration dictionary
+    """
+    config = dict(DEFAULT_CONFIG)
+    if not config_file:
+        return config
 
-            # Check if the title exists in project_logos
-            if title in project_logos.keys():
-                company_logo_url = project_logos[title][1]
-            else:
-                print(f"Warning: No logo found for project '{title}'.")
-                company_logo_url = "" # Replace with your actual default URL https://default-logo-url.com/default-logo.png
+    if config_file.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(config_file, 'rb') as file:
+            loaded = tomllib.load(file)
+    else:
+        import json
 
-            if not os.path.exists(output_folder):
-                os.mkdir(output_folder)
+        with open(config_file, 'r', encoding="utf-8") as file:
+            loaded = json.load(file)
 
-            sanitized_title = re.sub(r'[<>:"/\\|?*]', '_', title)
-            output_file_path = os.path.join(output_folder, f"{sanitized_title}.html")
+    unknown = set(loaded) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown config keys in '{config_file}': {', '.join(sorted(unknown))}")
 
-            
+    config.update(loaded)
+    return config
 
-            generate_html(
-                title=title,
-                logo_url=company_logo_url,
-                expertise_dict=special_logos,
-                number_candidates=len(candidates),
-                candidates=candidates,
-                output_file=output_file_path,
-                job_id=project_logos[title][0],  
-            )
-            print(f"HTML file generated for project '{title}' at {output_file_path}")
 
+def run_from_config(config, output_folder=None):
+    """
+    Run generate_german_emails() with the given configuration.
 
-if __name__ == "__main__":
+    :param config: The configuration dictionary, see load_config().
+    :param output_folder: Overrides the output folder of the configuration.
+    """
+    for name, schema in config["header_schemas"].items():
+        register_header_schema(name, schema)
+
+    generate_german_emails(
+        config["input_folder"],
+        output_folder or config["output_folder"],
+        filter_eignung=config["filter_eignung"],
+        special_logos=config["special_logos"],
+        project_logos=config["project_logos"],
+        thumbnail_dir=config["thumbnail_dir"],
+        embed_thumbnails=config["embed_thumbnails"],
+        thumbnail_base_url=config["thumbnail_base_url"],
+        encoding=config["encoding"],
+        outputs=config["outputs"],
+        templates=config["templates"],
+        template_cache=config["template_cache"],
+    )
+
+
+def _input_snapshot(config, config_file=None):
+    """
+    Return the sizes and modification times of the CSV files, the template files and the
+    config file. Missing files are recorded as None, a missing input folder as no CSV files.
+    """
+    paths = list(config["templates"].values())
+    if config_file:
+        paths.append(config_file)
+    try:
+        paths += list_csv_files(config["input_folder"])
+    except OSError:
+        pass
+
+    snapshot = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            snapshot[path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            snapshot[path] = None
+    return snapshot
+
+
+def watch_folder(config, interval=2.0, config_file=None, overrides=None):
+    """
+    Regenerate the emails whenever a CSV file in the input folder, a template file or the
+    config file is added, changed or removed. Errors are printed and the watching goes on.
 
-    # Example data
-    candidates_info = {
-"123456": {
-    "url": "https://experteer.com/profile_photo"
-  ,"expertises": ["DATEV", "MS-Office", "Rechnungslegung US-GAAP und HGB", "SAP R/3 FI"]
-  },
-"123456": {
-    "url": "https://experteer.com/profile_photo"
-  ,"expertises":["B2B Sales", "B2C Sales", "Budgetverantwortung", "CAD", "CRM", "Cross- und Upselling"]
-},
-
-  
-}
-    project_logos = {
-        "Berater Projektfinanzierung (m/w/d)": ["123456", "//experteer.com/company_logo"],
-       "Bereichsleitung Schaden Außenregulierung (m/w/d)":["123456","//blobs.experteer.com/company_logo"],
-       "IT-Spezialist für Server- und Rechenzentrumsinfrastruktur (m/w/d)":["123456", "//blobs.experteer.com/company_logo"]
-       }
+    :param config: The configuration dictionary, see load_config().
+    :param interval: Polling interval in seconds.
+    :param config_file: Path to the config file, reloaded when it changes.
+    :param overrides: Configuration values from the command line, applied after each reload.
+    """
+    import time
+
+    print(f"Watching '{config['input_folder']}' (press Ctrl+C to stop).")
+    snapshot = None
+    try:
+        while True:
+            current = _input_snapshot(config, config_file)
+            if current != snapshot:
+                try:
+                    if config_file and snapshot is not None and current.get(config_file) != snapshot.get(config_file):
+                        config = load_config(config_file)
+                        config.update(overrides or {})
+                        current = _input_snapshot(config, config_file)
+                    run_from_config(config)
+                except Exception as e:
+                    print(f"Error generating the emails: {e}")
+                snapshot = current
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+
+
+def _print_timings(label, timings):
+    """
+    Print the min, mean and max of a list of timings in seconds.
+    """
+    print(f"{label}: min {min(timings) * 1000:.1f} ms, "
+          f"mean {sum(timings) / len(timings) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms")
 
-    
-    input_folder = "german_projects"  # Replace with the folder containing CSV files
-    output_folder = "german_projects_finished"
-    filter_eignung = True  # Only include "Sehr gut" and "Gut" candidates
-    generate_german_emails(input_folder, output_folder, filter_eignung=filter_eignung, special_logos=candidates_info,
-                           project_logos=project_logos)
-    #clear_folder("german_projects_finished")
 
+def benchmark(config, repeat=5):
+    """
+    Time the generation into a temporary folder.
+
+    Cold runs start a fresh "generate" process each time, so they include the interpreter
+    start, the imports and empty in-process caches, as in a webhook-triggered run. The bare
+    interpreter start is timed for comparison. Warm runs repeat the generation in this
+    process, with the modules imported and the caches filled.
+
+    :param config: The configuration dictionary, see load_config().
+    :param repeat: Number of runs of each kind.
+    """
+    import contextlib
+    import json
+    import subprocess
+    import tempfile
+    import time
+
+    def time_process(command):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as temp_folder:
+        output_folder = os.path.join(temp_folder, "output")
+        config_file = os.path.join(temp_folder, "config.json")
+        with open(config_file, 'w', encoding="utf-8") as file:
+            json.dump(dict(config, output_folder=output_folder), file, ensure_ascii=False)
+
+        script = os.path.abspath(__file__)
+        interpreter = [time_process([sys.executable, "-c", "pass"]) for _ in range(repeat)]
+        cold = [time_process([sys.executable, script, "generate", "-c", config_file]) for _ in range(repeat)]
+
+        warm = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(None):
+                run_from_config(config, output_folder=output_folder)
+            warm.append(time.perf_counter() - start)
+
+    _print_timings(f"Interpreter start ({repeat} processes)", interpreter)
+    _print_timings(f"Cold runs ({repeat} processes)", cold)
+    _print_timings(f"Warm runs ({repeat} in-process)", warm)
+
+
+def main(argv=None):
+    """
+    Command line entry point.
+
+    :param argv: Command line arguments. If None, sys.argv is used.
+    :return: The exit code
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate the Premium Recruitment Assistant emails from CSV exports.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-c", "--config", help="JSON or TOML config file")
+    common.add_argument("-i", "--input", dest="input_folder", action="append",
+                        help="folder containing the CSV files, can be repeated (e.g. one per locale)")
+    common.add_argument("-o", "--output", dest="output_folder", help="folder for the generated files")
+    common.add_argument("--encoding", help="encoding of the CSV files (skips the detection)")
+    common.add_argument("-f", "--format", dest="outputs", action="append", choices=sorted(OUTPUT_SINKS),
+                        help="output format, can be repeated (default: html)")
+
+    subparsers.add_parser("generate", parents=[common], help="generate the emails once")
+    watch_parser = subparsers.add_parser("watch", parents=[common], help="regenerate when the CSV files change")
+    watch_parser.add_argument("--interval", type=float, default=2.0, help="polling interval in seconds")
+    bench_parser = subparsers.add_parser(
+        "bench", parents=[common],
+        help="time cold runs (fresh processes, compared to a bare interpreter start) and warm in-process runs",
+    )
+    bench_parser.add_argument("--repeat", type=int, default=5, help="number of runs of each kind")
+    clean_parser = subparsers.add_parser("clean", parents=[common], help="remove the generated files")
+    clean_parser.add_argument("--thumbnails", action="store_true", help="also empty the thumbnail cache")
+    clean_parser.add_argument("--templates", action="store_true", help="also empty the compiled template cache")
+
+    args = parser.parse_args(argv)
+
+    overrides = {
+        key: getattr(args, key)
+        for key in ("input_folder", "output_folder", "encoding", "outputs")
+        if getattr(args, key) is not None
+    }
+    config = load_config(args.config)
+    config.update(overrides)
+
+    if args.command == "generate":
+        run_from_config(config)
+    elif args.command == "watch":
+        watch_folder(config, interval=args.interval, config_file=args.config, overrides=overrides)
+    elif args.command == "bench":
+        benchmark(config, repeat=args.repeat)
+    elif args.command == "clean":
+        clear_folder(config["output_folder"])
+        if args.thumbnails and config["thumbnail_dir"]:
+            clear_folder(config["thumbnail_dir"])
+        if args.templates and config["template_cache"]:
+            clear_folder(config["template_cache"])
+    return 0
 
+
+if __name__ == "__main__":
+    sys.exit(main())
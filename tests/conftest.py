@@ -0,0 +1,47 @@
+import csv
+import importlib.util
+import os
+import sys
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "generate_emails_german copy.py")
+
+GERMAN_HEADER = [
+    "Projektname", "Projekteignung", "Anrede", "Titel", "Vorname", "Nachname", "Mitglieds ID",
+    "Aktuelle Position", "Firma", "Branche", "E-Mail", "Telefonnummer", "URL Kandidatenprofil",
+]
+
+ITALIAN_HEADER = [
+    "Nome del progetto", "Valutazione del progetto", "Appellativo", "Titolo", "Nome", "Cognome", "ID membro",
+    "Posizione attuale", "Azienda", "Settore", "E-mail", "Numero di telefono", "URL profilo candidato",
+]
+
+
+@pytest.fixture(scope="session")
+def generator():
+    # The script name contains a space, so it is loaded from its path
+    spec = importlib.util.spec_from_file_location("generate_emails_german", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module  # Needed to pickle the worker function
+    spec.loader.exec_module(module)
+    yield module
+    del sys.modules[spec.name]
+
+
+@pytest.fixture
+def write_export(tmp_path):
+    """
+    Write a tab-separated export with the given header and rows of (project, rating, candidate id).
+    """
+    def write(file_name, header, rows):
+        path = tmp_path / file_name
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, delimiter="\t")
+            writer.writerow(header)
+            for project, rating, candidate_id in rows:
+                writer.writerow([project, rating, "", "", "Vorname", "Nachname", candidate_id,
+                                 "Position", "Firma", "Branche", "mail@example.com", "+49 1", "https://example.com"])
+        return str(path)
+
+    return write
@@ -0,0 +1,25 @@
+def test_generate_html_escapes_candidate_fields(generator, tmp_path):
+    output_file = tmp_path / "project.html"
+    candidate = {
+        "name": "<script>alert(1)</script>",
+        "id": "1",
+        "job_title": "CFO",
+        "company": 'ACME "<b>"',
+        "industry": "Banken",
+        "email": "mail@example.com",
+        "phone": "+49 1",
+        "photo_url": "https://example.com/photo.png",
+        "profile_url": 'https://example.com/"><script>',
+        "eignung": "Gut",
+    }
+
+    generator.generate_html(
+        title="Projekt", logo_url="example.com/logo.png", job_id="42", expertise_dict={},
+        number_candidates=1, candidates=[candidate], output_file=str(output_file),
+    )
+
+    html = output_file.read_text(encoding="utf-8")
+    assert "<script>" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "ACME &quot;&lt;b&gt;&quot;" in html
+    assert 'href="https://example.com/&quot;&gt;&lt;script&gt;"' in html
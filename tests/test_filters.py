@@ -0,0 +1,32 @@
+from conftest import GERMAN_HEADER
+
+ROWS = [
+    ("Projekt A", "Hervorragend", "1"),
+    ("", "Sehr gut", "2"),
+    ("", "Gut", "3"),
+    ("", "", "4"),
+]
+
+
+def candidate_ids(generator, csv_file, filter_eignung):
+    return [c["id"] for c in generator.extract_candidates_from_csv(csv_file, filter_eignung, encoding="utf-8")]
+
+
+def test_minimum_rating(generator, write_export):
+    csv_file = write_export("a.csv", GERMAN_HEADER, ROWS)
+
+    assert candidate_ids(generator, csv_file, {"min": "Sehr gut"}) == ["1", "2"]
+
+
+def test_per_project_override(generator, write_export):
+    csv_file = write_export("a.csv", GERMAN_HEADER, ROWS)
+    spec = {"min": "Hervorragend", "projects": {"Projekt A": ["Gut"]}}
+
+    assert candidate_ids(generator, csv_file, spec) == ["3"]
+    assert generator.compile_eignung_filter(spec, project="Projekt B") == frozenset(["Hervorragend"])
+
+
+def test_false_includes_all_candidates(generator, write_export):
+    csv_file = write_export("a.csv", GERMAN_HEADER, ROWS)
+
+    assert candidate_ids(generator, csv_file, False) == ["1", "2", "3", "4"]
@@ -0,0 +1,23 @@
+import pytest
+
+from conftest import ITALIAN_HEADER
+
+
+def test_italian_export_maps_ratings(generator, write_export):
+    csv_file = write_export("it.csv", ITALIAN_HEADER, [
+        ("Progetto", "Buono", "1"),
+        ("", "Eccellente", "2"),
+        ("", "Gut", "3"),
+    ])
+
+    title, candidates = generator.read_project_csv(csv_file, encoding="utf-8")
+
+    assert title == "Progetto"
+    assert [(c["id"], c["eignung"]) for c in candidates] == [("2", "Hervorragend"), ("1", "Gut")]
+
+
+def test_unknown_header_raises(generator, write_export):
+    csv_file = write_export("other.csv", ["A", "B"] + [""] * 11, [("x", "y", "1")])
+
+    with pytest.raises(ValueError, match="No header schema"):
+        generator.read_project_csv(csv_file, encoding="utf-8")
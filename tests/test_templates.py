@@ -0,0 +1,30 @@
+import pytest
+
+
+def test_compile_and_render(generator):
+    compiled = generator.compile_template("<h1>{title}</h1><style>p {{ margin: 0 }}</style>")
+
+    assert compiled == (("<h1>", "</h1><style>p { margin: 0 }</style>"), ("title",))
+    assert generator.render_template(compiled, {"title": "Projekt"}) == "<h1>Projekt</h1><style>p { margin: 0 }</style>"
+
+
+def test_compiled_template_is_cached_by_content(generator, tmp_path):
+    template_file = tmp_path / "header.html"
+    cache_dir = tmp_path / "cache"
+    template_file.write_text("<h1>{title}</h1>", encoding="utf-8")
+
+    compiled = generator.load_template(str(template_file), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 1
+    assert generator.load_template(str(template_file), cache_dir=str(cache_dir)) == compiled
+
+    template_file.write_text("<h2>{title}</h2>", encoding="utf-8")
+    generator.load_template(str(template_file), cache_dir=str(cache_dir))
+    assert len(list(cache_dir.iterdir())) == 2
+
+
+def test_unknown_slot_raises(generator, tmp_path):
+    template_file = tmp_path / "card.html"
+    template_file.write_text("<p>{candidat_name}</p>", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="candidat_name"):
+        generator.load_templates({"card": str(template_file)})
@@ -0,0 +1,23 @@
+import json
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_build_thumbnails_from_local_image(generator, tmp_path):
+    source = tmp_path / "photo.png"
+    Image.new("RGB", (1200, 900), "red").save(source)
+    cache_dir = tmp_path / "thumbs"
+
+    thumbnails = generator.build_thumbnails([(str(source), 100), (str(source), 100)], str(cache_dir), processes=1)
+
+    src = thumbnails[(str(source), 100)]
+    with Image.open(src) as thumbnail:
+        assert thumbnail.size == (100, 75)
+
+    # The second build is served from the index without resizing again
+    with open(cache_dir / generator.THUMBNAIL_INDEX_FILE, encoding="utf-8") as f:
+        assert os.path.basename(src) in json.load(f).values()
+    assert generator.build_thumbnails([(str(source), 100)], str(cache_dir), processes=1) == thumbnails